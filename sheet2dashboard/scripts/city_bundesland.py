@@ -0,0 +1,139 @@
+"""
+City -> Bundesland/Region mapping (DE / AT / CH) used by sanitize.py.
+
+Kept in its own module so the table can be extended without touching the
+sanitizer. Keys are lowercased, stripped city names (sanitize.py normalizes
+Stadt the same way before looking it up). The mapping is read-only at runtime;
+add cities to the literal below.
+"""
+
+from types import MappingProxyType
+
+CITY_BUNDESLAND = MappingProxyType({
+    # -- Deutschland --
+    "berlin": "Berlin",
+    "hamburg": "Hamburg",
+    "münchen": "Bayern",
+    "munich": "Bayern",
+    "köln": "Nordrhein-Westfalen",
+    "cologne": "Nordrhein-Westfalen",
+    "frankfurt": "Hessen",
+    "frankfurt am main": "Hessen",
+    "stuttgart": "Baden-Württemberg",
+    "düsseldorf": "Nordrhein-Westfalen",
+    "dortmund": "Nordrhein-Westfalen",
+    "essen": "Nordrhein-Westfalen",
+    "leipzig": "Sachsen",
+    "bremen": "Bremen",
+    "dresden": "Sachsen",
+    "hannover": "Niedersachsen",
+    "nürnberg": "Bayern",
+    "duisburg": "Nordrhein-Westfalen",
+    "bochum": "Nordrhein-Westfalen",
+    "wuppertal": "Nordrhein-Westfalen",
+    "bielefeld": "Nordrhein-Westfalen",
+    "bonn": "Nordrhein-Westfalen",
+    "münster": "Nordrhein-Westfalen",
+    "mannheim": "Baden-Württemberg",
+    "karlsruhe": "Baden-Württemberg",
+    "augsburg": "Bayern",
+    "wiesbaden": "Hessen",
+    "gelsenkirchen": "Nordrhein-Westfalen",
+    "mönchengladbach": "Nordrhein-Westfalen",
+    "aachen": "Nordrhein-Westfalen",
+    "braunschweig": "Niedersachsen",
+    "chemnitz": "Sachsen",
+    "kiel": "Schleswig-Holstein",
+    "halle": "Sachsen-Anhalt",
+    "magdeburg": "Sachsen-Anhalt",
+    "freiburg": "Baden-Württemberg",
+    "freiburg im breisgau": "Baden-Württemberg",
+    "krefeld": "Nordrhein-Westfalen",
+    "oberhausen": "Nordrhein-Westfalen",
+    "lübeck": "Schleswig-Holstein",
+    "erfurt": "Thüringen",
+    "rostock": "Mecklenburg-Vorpommern",
+    "mainz": "Rheinland-Pfalz",
+    "kassel": "Hessen",
+    "hagen": "Nordrhein-Westfalen",
+    "potsdam": "Brandenburg",
+    "saarbrücken": "Saarland",
+    "hamm": "Nordrhein-Westfalen",
+    "mülheim": "Nordrhein-Westfalen",
+    "mülheim-kärlich": "Rheinland-Pfalz",  # own town, not a district of Mülheim
+    "ludwigshafen": "Rheinland-Pfalz",
+    "oldenburg": "Niedersachsen",
+    "osnabrück": "Niedersachsen",
+    "leverkusen": "Nordrhein-Westfalen",
+    "darmstadt": "Hessen",
+    "heidelberg": "Baden-Württemberg",
+    "solingen": "Nordrhein-Westfalen",
+    "herne": "Nordrhein-Westfalen",
+    "neuss": "Nordrhein-Westfalen",
+    "regensburg": "Bayern",
+    "ingolstadt": "Bayern",
+    "würzburg": "Bayern",
+    "wolfsburg": "Niedersachsen",
+    "ulm": "Baden-Württemberg",
+    "göttingen": "Niedersachsen",
+    "pforzheim": "Baden-Württemberg",
+    "offenbach": "Hessen",
+    "bottrop": "Nordrhein-Westfalen",
+    "bremerhaven": "Bremen",
+    "recklinghausen": "Nordrhein-Westfalen",
+    "remscheid": "Nordrhein-Westfalen",
+    "fürth": "Bayern",
+    "trier": "Rheinland-Pfalz",
+    "koblenz": "Rheinland-Pfalz",
+    "erlangen": "Bayern",
+    "moers": "Nordrhein-Westfalen",
+    "siegen": "Nordrhein-Westfalen",
+    "hildesheim": "Niedersachsen",
+    "jena": "Thüringen",
+    # -- Österreich --
+    "wien": "Wien",
+    "vienna": "Wien",
+    "graz": "Steiermark",
+    "linz": "Oberösterreich",
+    "salzburg": "Salzburg",
+    "innsbruck": "Tirol",
+    "klagenfurt": "Kärnten",
+    "villach": "Kärnten",
+    "wels": "Oberösterreich",
+    "st. pölten": "Niederösterreich",
+    "dornbirn": "Vorarlberg",
+    "wiener neustadt": "Niederösterreich",
+    "steyr": "Oberösterreich",
+    "feldkirch": "Vorarlberg",
+    "bregenz": "Vorarlberg",
+    "leonding": "Oberösterreich",
+    "leoben": "Steiermark",
+    "amstetten": "Niederösterreich",
+    # -- Schweiz --
+    "zürich": "Zürich",
+    "zurich": "Zürich",
+    "genf": "Genf",
+    "genève": "Genf",
+    "basel": "Basel-Stadt",
+    "bern": "Bern",
+    "lausanne": "Waadt",
+    "winterthur": "Zürich",
+    "luzern": "Luzern",
+    "st. gallen": "St. Gallen",
+    "biel": "Bern",
+    "thun": "Bern",
+    "köniz": "Bern",
+    "la chaux-de-fonds": "Neuenburg",
+    "schaffhausen": "Schaffhausen",
+    "fribourg": "Freiburg",
+    "freiburg": "Freiburg",
+    "chur": "Graubünden",
+    "vernier": "Genf",
+    "uster": "Zürich",
+    "sion": "Wallis",
+    "neuchâtel": "Neuenburg",
+    "lugano": "Tessin",
+    "zug": "Zug",
+    "aarau": "Aargau",
+    "emmen": "Luzern",
+})
@@ -4,173 +4,151 @@ Sheet-to-Dashboard Sanitizer
 Reads an Excel file, cleans and enriches the data, writes sanitized-data.xlsx.
 
 Usage:
-    python sanitize.py <input.xlsx> [output.xlsx]
+    python sanitize.py <input.xlsx> [output.xlsx] [--emit-long] [--cache]
+
+    --cache keeps the parsed input sheet as <input.xlsx>.<hash>.parquet next to
+    the input (needs pyarrow); re-runs on an unchanged file skip the xlsx parse.
 
 Output:
-    sanitized-data.xlsx with two sheets:
+    sanitized-data.xlsx with the sheets:
       - "data"       : wide format (one row per person)
-      - "facts_long" : tidy/long format (one row per person per month)
+      - "facts_long" : tidy/long format (one row per person per month);
+                       only with --emit-long, the dashboard does not need it
 """
 
+import os
 import sys
 import re
 import math
+import glob
+import hashlib
 from pathlib import Path
 
 try:
+    import numpy as np
     import pandas as pd
     import openpyxl
+    from openpyxl.cell import WriteOnlyCell
     from openpyxl.styles import Font, PatternFill, Alignment
 except ImportError:
     print("Missing dependencies. Run: pip install pandas openpyxl")
     sys.exit(1)
 
-# ---------------------------------------------------------------------------
-# City -> Bundesland/Region mapping (DE / AT / CH)
-# ---------------------------------------------------------------------------
-CITY_BUNDESLAND = {
-    # -- Deutschland --
-    "berlin": "Berlin",
-    "hamburg": "Hamburg",
-    "münchen": "Bayern",
-    "munich": "Bayern",
-    "köln": "Nordrhein-Westfalen",
-    "cologne": "Nordrhein-Westfalen",
-    "frankfurt": "Hessen",
-    "frankfurt am main": "Hessen",
-    "stuttgart": "Baden-Württemberg",
-    "düsseldorf": "Nordrhein-Westfalen",
-    "dortmund": "Nordrhein-Westfalen",
-    "essen": "Nordrhein-Westfalen",
-    "leipzig": "Sachsen",
-    "bremen": "Bremen",
-    "dresden": "Sachsen",
-    "hannover": "Niedersachsen",
-    "nürnberg": "Bayern",
-    "duisburg": "Nordrhein-Westfalen",
-    "bochum": "Nordrhein-Westfalen",
-    "wuppertal": "Nordrhein-Westfalen",
-    "bielefeld": "Nordrhein-Westfalen",
-    "bonn": "Nordrhein-Westfalen",
-    "münster": "Nordrhein-Westfalen",
-    "mannheim": "Baden-Württemberg",
-    "karlsruhe": "Baden-Württemberg",
-    "augsburg": "Bayern",
-    "wiesbaden": "Hessen",
-    "gelsenkirchen": "Nordrhein-Westfalen",
-    "mönchengladbach": "Nordrhein-Westfalen",
-    "aachen": "Nordrhein-Westfalen",
-    "braunschweig": "Niedersachsen",
-    "chemnitz": "Sachsen",
-    "kiel": "Schleswig-Holstein",
-    "halle": "Sachsen-Anhalt",
-    "magdeburg": "Sachsen-Anhalt",
-    "freiburg": "Baden-Württemberg",
-    "freiburg im breisgau": "Baden-Württemberg",
-    "krefeld": "Nordrhein-Westfalen",
-    "oberhausen": "Nordrhein-Westfalen",
-    "lübeck": "Schleswig-Holstein",
-    "erfurt": "Thüringen",
-    "rostock": "Mecklenburg-Vorpommern",
-    "mainz": "Rheinland-Pfalz",
-    "kassel": "Hessen",
-    "hagen": "Nordrhein-Westfalen",
-    "potsdam": "Brandenburg",
-    "saarbrücken": "Saarland",
-    "hamm": "Nordrhein-Westfalen",
-    "mülheim": "Nordrhein-Westfalen",
-    "ludwigshafen": "Rheinland-Pfalz",
-    "oldenburg": "Niedersachsen",
-    "osnabrück": "Niedersachsen",
-    "leverkusen": "Nordrhein-Westfalen",
-    "darmstadt": "Hessen",
-    "heidelberg": "Baden-Württemberg",
-    "solingen": "Nordrhein-Westfalen",
-    "herne": "Nordrhein-Westfalen",
-    "neuss": "Nordrhein-Westfalen",
-    "regensburg": "Bayern",
-    "ingolstadt": "Bayern",
-    "würzburg": "Bayern",
-    "wolfsburg": "Niedersachsen",
-    "ulm": "Baden-Württemberg",
-    "göttingen": "Niedersachsen",
-    "pforzheim": "Baden-Württemberg",
-    "offenbach": "Hessen",
-    "bottrop": "Nordrhein-Westfalen",
-    "bremerhaven": "Bremen",
-    "recklinghausen": "Nordrhein-Westfalen",
-    "remscheid": "Nordrhein-Westfalen",
-    "fürth": "Bayern",
-    "trier": "Rheinland-Pfalz",
-    "koblenz": "Rheinland-Pfalz",
-    "erlangen": "Bayern",
-    "moers": "Nordrhein-Westfalen",
-    "siegen": "Nordrhein-Westfalen",
-    "hildesheim": "Niedersachsen",
-    "jena": "Thüringen",
-    # -- Österreich --
-    "wien": "Wien",
-    "vienna": "Wien",
-    "graz": "Steiermark",
-    "linz": "Oberösterreich",
-    "salzburg": "Salzburg",
-    "innsbruck": "Tirol",
-    "klagenfurt": "Kärnten",
-    "villach": "Kärnten",
-    "wels": "Oberösterreich",
-    "st. pölten": "Niederösterreich",
-    "dornbirn": "Vorarlberg",
-    "wiener neustadt": "Niederösterreich",
-    "steyr": "Oberösterreich",
-    "feldkirch": "Vorarlberg",
-    "bregenz": "Vorarlberg",
-    "leonding": "Oberösterreich",
-    "leoben": "Steiermark",
-    "amstetten": "Niederösterreich",
-    # -- Schweiz --
-    "zürich": "Zürich",
-    "zurich": "Zürich",
-    "genf": "Genf",
-    "genève": "Genf",
-    "basel": "Basel-Stadt",
-    "bern": "Bern",
-    "lausanne": "Waadt",
-    "winterthur": "Zürich",
-    "luzern": "Luzern",
-    "st. gallen": "St. Gallen",
-    "biel": "Bern",
-    "thun": "Bern",
-    "köniz": "Bern",
-    "la chaux-de-fonds": "Neuenburg",
-    "schaffhausen": "Schaffhausen",
-    "fribourg": "Freiburg",
-    "freiburg": "Freiburg",
-    "chur": "Graubünden",
-    "vernier": "Genf",
-    "uster": "Zürich",
-    "sion": "Wallis",
-    "neuchâtel": "Neuenburg",
-    "lugano": "Tessin",
-    "zug": "Zug",
-    "aarau": "Aargau",
-    "emmen": "Luzern",
+try:
+    import pyarrow as pa  # Parquet IO for the optional --cache
+    HAVE_PYARROW = True
+except ImportError:
+    HAVE_PYARROW = False
+
+from city_bundesland import CITY_BUNDESLAND
+from xlsx_reader import dedup_names, read_sheet
+
+
+# A known city name followed only by a postcode/district number ("münchen 12",
+# "wien 1100") or a hyphenated district ("münchen-perlach", "berlin - prenzlauer-berg").
+# Qualified names such as "frankfurt (oder)" or "linz am rhein" are other places and
+# do not match; neither do "neu-ulm" or "bad essen".
+CITY_VARIANT_RE = re.compile(
+    "(" + "|".join(sorted(map(re.escape, CITY_BUNDESLAND), key=len, reverse=True)) + ")"
+    + r"(?:\s+\d{1,5}|\s*-\s*[^\W\d_]+(?:-[^\W\d_]+)*)"
+)
+
+# Output column layout: person/id columns, then Umsatz_* (chronological), then the features
+BASE_COLS = ("Vorname", "Nachname", "Stadt", "Bundesland", "Abteilung", "Beruf", "Teilzeit", "Alter")
+TAIL_COLS = ("Umsatz_Gesamt", "Umsatz_OE_Monat")
+ID_COLS = BASE_COLS  # repeated on every facts_long row
+
+# People (wide rows) reshaped per facts_long chunk; bounds peak memory to chunk x months
+LONG_CHUNK_ROWS = 5000
+
+# Teilzeit spellings (lowercased) -> Ja/Nein
+TEILZEIT_MAP = {
+    "ja": "Ja", "yes": "Ja", "1": "Ja", "true": "Ja", "j": "Ja", "y": "Ja",
+    "nein": "Nein", "no": "Nein", "0": "Nein", "false": "Nein", "n": "Nein",
 }
 
 
+def resolve_city(city: str):
+    """Return the CITY_BUNDESLAND key for a city name (exact, else a known city name plus
+    a district number or hyphenated district, e.g. 'München 12'), or None."""
+    key = str(city).strip().lower()
+    if key in CITY_BUNDESLAND:
+        return key
+    m = CITY_VARIANT_RE.fullmatch(key)
+    return m.group(1) if m else None
+
+
 def lookup_bundesland(city: str) -> str:
     """Map city name to Bundesland/Kanton/Land."""
-    key = str(city).strip().lower()
-    return CITY_BUNDESLAND.get(key, "Unbekannt")
+    key = resolve_city(city)
+    return CITY_BUNDESLAND[key] if key else "Unbekannt"
+
+
+def is_umsatz_col(c) -> bool:
+    """True for 'Umsatz_YYYY-MM' (prefix case-insensitive), checked by plain slicing."""
+    return (
+        isinstance(c, str) and len(c) == 14 and c[:7].lower() == "umsatz_"
+        and c[7:11].isdecimal() and c[11] == "-" and c[12:14].isdecimal()
+    )
 
 
 def detect_umsatz_cols(df: pd.DataFrame):
     """Return sorted list of Umsatz_YYYY-MM column names."""
-    pattern = re.compile(r"^Umsatz_\d{4}-\d{2}$", re.IGNORECASE)
-    cols = [c for c in df.columns if pattern.match(str(c))]
+    cols = [c for c in df.columns if is_umsatz_col(c)]
     cols.sort()
     return cols
 
 
+def _file_digest(path: str) -> str:
+    """SHA-1 of the file contents, read in 1 MiB blocks."""
+    h = hashlib.sha1()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _load_input(input_path: str, use_cache: bool = False) -> pd.DataFrame:
+    """Read the input sheet with stripped column names; with use_cache, go through a
+    content-hash-keyed Parquet copy next to the input."""
+    if use_cache and not HAVE_PYARROW:
+        print("Hinweis: --cache braucht 'pip install pyarrow'; lese ohne Cache.")
+        use_cache = False
+    if use_cache:
+        cache = Path(f"{input_path}.{_file_digest(input_path)[:16]}.parquet")
+        # Caches of earlier versions of this input are never read again
+        name = Path(input_path).name
+        stale = re.compile(re.escape(name) + r"\.[0-9a-f]{16}\.parquet")
+        for old in cache.parent.glob(glob.escape(name) + ".*.parquet"):
+            if old != cache and stale.fullmatch(old.name):
+                old.unlink(missing_ok=True)
+        if cache.exists():
+            try:
+                df = pd.read_parquet(cache)
+                print(f"Cache: {cache}")
+                return df
+            except (pa.ArrowException, OSError) as e:
+                # Damaged (e.g. from an interrupted run): drop it and parse the xlsx again
+                cache.unlink(missing_ok=True)
+                print(f"Hinweis: Cache unlesbar, wird neu erstellt ({e})")
+
+    df = read_sheet(input_path, sheet=0)
+    # Stripping can make names collide again (" x" / "x"); keep them unique
+    df.columns = dedup_names(str(c).strip() for c in df.columns)
+
+    if use_cache:
+        # Written under a temp name and renamed, so the cache path never holds a partial file
+        tmp = cache.with_name(cache.name + ".tmp")
+        try:
+            df.to_parquet(tmp, compression="zstd", index=False)
+            os.replace(tmp, cache)
+        except (pa.ArrowException, ValueError, OSError) as e:
+            # e.g. a column mixing text and numbers; the run itself is unaffected
+            tmp.unlink(missing_ok=True)
+            print(f"Hinweis: Cache nicht geschrieben ({e})")
+    return df
+
+
 def normalize_name(df: pd.DataFrame, warnings: list) -> pd.DataFrame:
     """Split Name -> Vorname / Nachname if needed, trim existing cols."""
     cols = [c.strip() for c in df.columns]
@@ -181,23 +159,17 @@ def normalize_name(df: pd.DataFrame, warnings: list) -> pd.DataFrame:
     has_nachname = "Nachname" in df.columns
 
     if has_vorname and has_nachname:
-        df["Vorname"] = df["Vorname"].astype(str).str.strip()
-        df["Nachname"] = df["Nachname"].astype(str).str.strip()
+        # "string" dtype: Arrow-backed (one vectorized kernel) when pyarrow is installed
+        df["Vorname"] = df["Vorname"].astype("string").str.strip()
+        df["Nachname"] = df["Nachname"].astype("string").str.strip()
     elif has_name:
-        def split_name(val):
-            parts = str(val).strip().split()
-            parts = [p for p in parts if p]
-            if len(parts) == 0:
-                return ("", "")
-            elif len(parts) == 1:
-                return (parts[0], "")
-            else:
-                # First token = Vorname, rest = Nachname (handles double surnames)
-                return (parts[0], " ".join(parts[1:]))
-
-        split = df["Name"].apply(split_name)
-        df.insert(0, "Vorname", split.apply(lambda x: x[0]))
-        df.insert(1, "Nachname", split.apply(lambda x: x[1]))
+        # First token = Vorname, rest = Nachname (handles double surnames)
+        # Python-backed strings: Arrow's regex \s is ASCII-only and would keep
+        # non-breaking/em spaces from Excel exports inside the first token
+        name = df["Name"].astype("string[python]").str.replace(r"\s+", " ", regex=True).str.strip()
+        split = name.str.split(" ", n=1, expand=True).reindex(columns=[0, 1]).fillna("")
+        df.insert(0, "Vorname", split[0])
+        df.insert(1, "Nachname", split[1])
         df.drop(columns=["Name"], inplace=True)
     else:
         warnings.append("WARN: Keine Name/Vorname/Nachname-Spalte gefunden. Spalten werden als leer erzeugt.")
@@ -217,13 +189,52 @@ def schema_check(df: pd.DataFrame) -> list:
     return issues
 
 
-def sanitize(input_path: str, output_path: str):
+def iter_long_chunks(df: pd.DataFrame, umsatz_cols: list, id_cols=ID_COLS, chunk_size: int = LONG_CHUNK_ROWS):
+    """Yield the tidy format (id_cols, Datum, Umsatz) for chunk_size people at a time,
+    ordered by Abteilung, Nachname, person, Datum across all chunks."""
+    # Order the N wide rows by Abteilung/Nachname first (stable, so people with
+    # the same Abteilung and Nachname keep their wide order); stack() keeps the
+    # row order and emits each person's months chronologically, so no N*M sort
+    order = df[["Abteilung", "Nachname"]].sort_values(["Abteilung", "Nachname"], kind="stable").index
+    # Datum comes from the renamed column labels (no string op on the N*M rows) and
+    # stays categorical: M labels plus small integer codes per long row
+    months = pd.CategoricalIndex([c[len("Umsatz_"):] for c in umsatz_cols], ordered=True, name="Datum")
+    for start in range(0, len(order), chunk_size):
+        part = df.loc[order[start:start + chunk_size]]
+        # Reshape only the value block; id columns are aligned back by row index
+        # instead of being copied M times as melt() does
+        long_vals = part[umsatz_cols].set_axis(months, axis=1).stack().rename("Umsatz").reset_index(level=1)
+        yield part[list(id_cols)].join(long_vals, how="right")
+
+
+def _frame_rows(df: pd.DataFrame):
+    """Rows of df as tuples of Python values (missing -> None = empty cell, as to_excel does)."""
+    columns = [s.astype(object).where(s.notna(), None).tolist() for _, s in df.items()]
+    return zip(*columns)
+
+
+def _write_sheet(wb, title: str, header: list, rows):
+    """Append rows to a new write-only sheet: styled, frozen header row, then one ws.append per row."""
+    ws = wb.create_sheet(title)
+    ws.freeze_panes = "A2"
+    header_cells = []
+    for name in header:
+        cell = WriteOnlyCell(ws, value=str(name))
+        cell.font = Font(bold=True, color="FFFFFF")
+        cell.fill = PatternFill("solid", fgColor="2D4A6B")
+        cell.alignment = Alignment(horizontal="center")
+        header_cells.append(cell)
+    ws.append(header_cells)
+    for row in rows:
+        ws.append(row)
+
+
+def sanitize(input_path: str, output_path: str, emit_long: bool = False, use_cache: bool = False):
     warnings = []
     errors = []
 
     print(f"Lese: {input_path}")
-    df = pd.read_excel(input_path, sheet_name=0)
-    df.columns = [str(c).strip() for c in df.columns]
+    df = _load_input(input_path, use_cache)
     original_count = len(df)
 
     # 1. Schema check
@@ -240,74 +251,75 @@ def sanitize(input_path: str, output_path: str):
     df = normalize_name(df, warnings)
 
     # 3. Datentypen normalisieren
-    #    Alter -> int
-    df["Alter"] = pd.to_numeric(df["Alter"], errors="coerce").fillna(0).astype(int)
+    #    Alter -> int, stored in the smallest integer dtype that holds the values (int8 for ages)
+    alter = pd.to_numeric(df["Alter"], errors="coerce").fillna(0).astype(int)
+    df["Alter"] = pd.to_numeric(alter, downcast="integer")
 
     #    Teilzeit -> Ja/Nein
-    def norm_teilzeit(val):
-        v = str(val).strip().lower()
-        if v in ("ja", "yes", "1", "true", "j", "y"):
-            return "Ja"
-        elif v in ("nein", "no", "0", "false", "n"):
-            return "Nein"
-        else:
-            warnings.append(f"WARN: Unbekannter Teilzeit-Wert '{val}' -> 'Nein'")
-            return "Nein"
-
-    df["Teilzeit"] = df["Teilzeit"].apply(norm_teilzeit)
+    teilzeit = df["Teilzeit"].astype("string").str.strip().str.lower()
+    mapped = teilzeit.map(TEILZEIT_MAP)
+    unknown_teilzeit = teilzeit[mapped.isna() & teilzeit.notna()].unique().tolist()
+    df["Teilzeit"] = mapped.fillna("Nein")
 
     #    Stadt / Bundesland
     df["Stadt"] = df["Stadt"].astype(str).str.strip()
 
     #    Umsatz_* columns
     umsatz_cols = detect_umsatz_cols(df)
-    if not umsatz_cols:
-        warnings.append("WARN: Keine Umsatz_YYYY-MM-Spalten gefunden.")
-
-    for col in umsatz_cols:
-        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
-        df[col] = df[col].clip(lower=0)
 
-    # 4. Bundesland ableiten
-    df["Bundesland"] = df["Stadt"].apply(lookup_bundesland)
-    unknown_cities = df[df["Bundesland"] == "Unbekannt"]["Stadt"].unique().tolist()
-    if unknown_cities:
-        warnings.append(f"WARN: Unbekannte Städte ({len(unknown_cities)}): {', '.join(unknown_cities[:10])}")
-
-    # 5. Umsatz-Features berechnen
+    # One 2-D block: coerce, blanks -> 0, negatives -> 0 in place, assign back once.
+    # The reader already types clean columns as numbers; only text/mixed ones need to_numeric
+    text_cols = [c for c in umsatz_cols if not pd.api.types.is_numeric_dtype(df[c])]
+    if text_cols:
+        df[text_cols] = df[text_cols].apply(pd.to_numeric, errors="coerce")
+    block = df[umsatz_cols].to_numpy(dtype=np.float64, na_value=0.0)
+    np.clip(block, 0, None, out=block)
+    df[umsatz_cols] = block
+
+    # 4. Bundesland ableiten (same rule as lookup_bundesland).
+    #    Cities repeat a lot: resolve each distinct city once, then broadcast via the codes
+    stadt = df["Stadt"].astype("category")
+    cities = stadt.cat.categories.tolist()
+    keys = [resolve_city(c) for c in cities]
+    # Extra trailing "Unbekannt" slot for missing Stadt (category code -1)
+    lut = np.array([CITY_BUNDESLAND[k] if k else "Unbekannt" for k in keys] + ["Unbekannt"], dtype=object)
+    codes = stadt.cat.codes.to_numpy()
+    df["Bundesland"] = lut[np.where(codes < 0, len(lut) - 1, codes)]
+    partial_cities = [f"{c} -> {k}" for c, k in zip(cities, keys) if k and k != c.lower()]
+    unknown_cities = df.loc[df["Bundesland"] == "Unbekannt", "Stadt"].fillna("(leer)").unique().tolist()
+
+    # 5. Umsatz-Features berechnen (both from the cleaned block, read once)
     if umsatz_cols:
-        df["Umsatz_Gesamt"] = df[umsatz_cols].sum(axis=1)
-        df["Umsatz_OE_Monat"] = (df["Umsatz_Gesamt"] / len(umsatz_cols)).round(2)
+        totals = np.add.reduce(block, axis=1, dtype=np.float64)
+        df["Umsatz_Gesamt"] = totals
+        df["Umsatz_OE_Monat"] = np.round(totals / len(umsatz_cols), 2)
     else:
         df["Umsatz_Gesamt"] = 0
         df["Umsatz_OE_Monat"] = 0
 
+    # Warnings are assembled here from the aggregates above, once per kind
+    if unknown_teilzeit:
+        warnings.append(f"WARN: Unbekannte Teilzeit-Werte ({len(unknown_teilzeit)}) -> 'Nein': "
+                        f"{', '.join(unknown_teilzeit[:10])}")
+    if not umsatz_cols:
+        warnings.append("WARN: Keine Umsatz_YYYY-MM-Spalten gefunden.")
+    if unknown_cities:
+        warnings.append(f"WARN: Unbekannte Städte ({len(unknown_cities)}): {', '.join(unknown_cities[:10])}")
+    if partial_cities:
+        warnings.append(f"WARN: Städte per Stadtteil/Bezirk zugeordnet ({len(partial_cities)}), bitte prüfen: "
+                        f"{', '.join(partial_cities[:10])}")
+
+    # Low-cardinality text columns as categoricals: int codes + a few labels per column
+    for col in ["Stadt", "Bundesland", "Abteilung", "Beruf", "Teilzeit"]:
+        df[col] = df[col].astype("category")
+
     # 6. Spaltenreihenfolge + Sortierung
-    base_cols = ["Vorname", "Nachname", "Stadt", "Bundesland", "Abteilung", "Beruf", "Teilzeit", "Alter"]
-    tail_cols = ["Umsatz_Gesamt", "Umsatz_OE_Monat"]
-    extra_cols = [c for c in df.columns if c not in base_cols + umsatz_cols + tail_cols]
-    # drop original Name if still present
-    extra_cols = [c for c in extra_cols if c != "Name"]
-
-    ordered_cols = base_cols + umsatz_cols + tail_cols
-    df = df[ordered_cols]
+    # reindex drops everything else (incl. a leftover Name column); under pandas'
+    # copy-on-write only the blocks that actually change order are copied
+    df = df.reindex(columns=[*BASE_COLS, *umsatz_cols, *TAIL_COLS])
     df = df.sort_values(["Abteilung", "Beruf", "Nachname"]).reset_index(drop=True)
 
-    # 7. Long format (tidy)
-    id_cols = ["Vorname", "Nachname", "Stadt", "Bundesland", "Abteilung", "Beruf", "Teilzeit", "Alter"]
-    if umsatz_cols:
-        df_long = df[id_cols + umsatz_cols].melt(
-            id_vars=id_cols,
-            value_vars=umsatz_cols,
-            var_name="Datum",
-            value_name="Umsatz"
-        )
-        df_long["Datum"] = df_long["Datum"].str.replace("Umsatz_", "", regex=False)
-        df_long = df_long.sort_values(["Abteilung", "Nachname", "Datum"]).reset_index(drop=True)
-    else:
-        df_long = pd.DataFrame()
-
-    # 8. Summary
+    # 7. Summary
     date_range = f"{umsatz_cols[0].replace('Umsatz_','')} bis {umsatz_cols[-1].replace('Umsatz_','')}" if umsatz_cols else "keine"
     print(f"\n--- Zusammenfassung ---")
     print(f"Datensaetze:       {original_count}")
@@ -317,30 +329,27 @@ def sanitize(input_path: str, output_path: str):
         print(f"  {w}")
     print(f"Default-Filter:    Alle Abteilungen, letztes volles Jahr")
 
-    # 9. Write Excel
-    with pd.ExcelWriter(output_path, engine="openpyxl") as writer:
-        df.to_excel(writer, sheet_name="data", index=False)
-        if not df_long.empty:
-            df_long.to_excel(writer, sheet_name="facts_long", index=False)
-
-        # Style header rows
-        wb = writer.book
-        for sheet_name in writer.sheets:
-            ws = wb[sheet_name]
-            for cell in ws[1]:
-                cell.font = Font(bold=True, color="FFFFFF")
-                cell.fill = PatternFill("solid", fgColor="2D4A6B")
-                cell.alignment = Alignment(horizontal="center")
-            ws.freeze_panes = "A2"
+    # 8. Write Excel (write-only workbook: rows are streamed, no in-memory cell DOM)
+    wb = openpyxl.Workbook(write_only=True)
+    _write_sheet(wb, "data", df.columns, _frame_rows(df))
+    # Long format (tidy), opt-in: it is N*M rows and generate_dashboard.py reads only "data".
+    # Reshaped and written chunk by chunk; the full long frame is never built
+    if emit_long and umsatz_cols:
+        long_rows = (row for chunk in iter_long_chunks(df, umsatz_cols) for row in _frame_rows(chunk))
+        _write_sheet(wb, "facts_long", [*ID_COLS, "Datum", "Umsatz"], long_rows)
+    wb.save(output_path)
 
     print(f"\nGespeichert: {output_path}")
-    return df, df_long, umsatz_cols, warnings
+    return df, umsatz_cols, warnings
 
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python sanitize.py <input.xlsx> [output.xlsx]")
+    args = [a for a in sys.argv[1:] if a not in ("--emit-long", "--no-emit-long", "--cache")]
+    emit_long = "--emit-long" in sys.argv[1:]
+    use_cache = "--cache" in sys.argv[1:]
+    if len(args) < 1:
+        print("Usage: python sanitize.py <input.xlsx> [output.xlsx] [--emit-long] [--cache]")
         sys.exit(1)
-    inp = sys.argv[1]
-    out = sys.argv[2] if len(sys.argv) > 2 else "sanitized-data.xlsx"
-    sanitize(inp, out)
+    inp = args[0]
+    out = args[1] if len(args) > 1 else "sanitized-data.xlsx"
+    sanitize(inp, out, emit_long=emit_long, use_cache=use_cache)
@@ -0,0 +1,74 @@
+"""
+Sheet reader shared by sanitize.py and generate_dashboard.py.
+
+Uses pandas' calamine engine when python-calamine is installed and otherwise
+streams the sheet through openpyxl's read-only mode. Both paths return the same
+frame: "Unnamed: i" for blank header cells, "x.1" for repeated names, interior
+blank rows kept, trailing empty rows/columns dropped.
+"""
+
+import pandas as pd
+import openpyxl
+
+# engine="calamine" exists since pandas 2.2; older versions reject it with a ValueError
+PANDAS_HAS_CALAMINE = tuple(int(p) for p in pd.__version__.split(".")[:2]) >= (2, 2)
+
+try:
+    import python_calamine  # noqa: F401  (Rust xlsx reader behind pandas' engine="calamine")
+    HAVE_CALAMINE = PANDAS_HAS_CALAMINE
+except ImportError:
+    HAVE_CALAMINE = False
+
+
+def dedup_names(names) -> list:
+    """Make column names unique the way pd.read_excel does: 'x', 'x.1', 'x.2', ...
+    (suffixes that already occur as a header of their own are skipped)."""
+    names = list(names)
+    counts = {}
+    for i, name in enumerate(names):
+        count = counts.get(name, 0)
+        if count > 0:
+            base = name
+            while count > 0:
+                counts[base] = count + 1
+                name = f"{base}.{count}"
+                count = count + 1 if name in names else counts.get(name, 0)
+            names[i] = name
+        counts[name] = count + 1
+    return names
+
+
+def _is_blank(v) -> bool:
+    return v is None or (isinstance(v, str) and not v.strip())
+
+
+def read_sheet(input_path: str, sheet=0) -> pd.DataFrame:
+    """Read one sheet (index or name) with calamine if installed, else via openpyxl."""
+    if HAVE_CALAMINE:
+        return pd.read_excel(input_path, sheet_name=sheet, engine="calamine")
+
+    if PANDAS_HAS_CALAMINE:
+        print("Hinweis: 'pip install python-calamine' beschleunigt das Einlesen großer Dateien.")
+    else:
+        print("Hinweis: pandas >= 2.2 und 'pip install python-calamine' beschleunigen das Einlesen großer Dateien.")
+    wb = openpyxl.load_workbook(input_path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[sheet] if isinstance(sheet, int) else wb[sheet]
+        it = ws.iter_rows(values_only=True)
+        header = next(it, ())
+        rows = list(it)
+    finally:
+        wb.close()
+
+    # The sheet dimension can include formatted but empty cells; read_excel ignores
+    # trailing empty rows and columns, but keeps blank rows between data rows
+    while rows and all(v is None for v in rows[-1]):
+        rows.pop()
+    width = max(
+        [i + 1 for i, v in enumerate(header) if not _is_blank(v)]
+        + [max((i + 1 for i, v in enumerate(r) if v is not None), default=0) for r in rows],
+        default=0,
+    )
+    header = tuple(header[:width]) + (None,) * (width - len(header))
+    columns = dedup_names(f"Unnamed: {i}" if _is_blank(v) else v for i, v in enumerate(header))
+    return pd.DataFrame.from_records((r[:width] for r in rows), columns=columns)